@@ -1,190 +1,375 @@
 import sys
 import numpy as np
+from numba import njit
 from PyQt5.QtCore import Qt, QAbstractTableModel, QVariant
 from PyQt5.QtWidgets import QTableView, QMainWindow, QApplication, QPushButton, QMessageBox
 from PyQt5.QtGui import QColor, QFont, QPainter, QPen
 
 # Algorithm X via Dancing Links:
 # https://arxiv.org/pdf/cs/0011047.pdf
+# The links are int32 arrays indexed by node id, which lets the covering and searching below be compiled by Numba
+# into native code working directly on the arrays.  The four links of a node sit next to each other in one row of
+# links, so covering or uncovering a node touches a single cache line.  Walks down a column just count its size[]
+# nodes, which covering or uncovering the rows in it does not change.  Every cover/uncover function below takes the
+# same leading arguments (links, col, row, size, bucket_next, bucket_prev), even the ones that don't use all of them,
+# so that DLX can pass its arrays to any of them as *self._arrays:
+LEFT, RIGHT, UP, DOWN = range(4)
+
+@njit(cache=True)
+def _bucket_remove(bucket_next, bucket_prev, col_node):
+    ''' take column out of the bucket of its size '''
+    bucket_next[bucket_prev[col_node]] = bucket_next[col_node]
+    bucket_prev[bucket_next[col_node]] = bucket_prev[col_node]
+
+
+@njit(cache=True)
+def _bucket_insert(size, bucket_next, bucket_prev, col_node):
+    ''' put column at the front of the bucket of its size '''
+    head = len(size) + size[col_node]
+    bucket_next[col_node] = bucket_next[head]
+    bucket_prev[col_node] = head
+    bucket_prev[bucket_next[head]] = col_node
+    bucket_next[head] = col_node
+
+
+@njit(cache=True)
+def _resize(size, bucket_next, bucket_prev, col_node, delta):
+    ''' change size of column by delta, moving it from the bucket of its old size to the bucket of its new size '''
+    _bucket_remove(bucket_next, bucket_prev, col_node)
+    size[col_node] += delta
+    _bucket_insert(size, bucket_next, bucket_prev, col_node)
+
+
+@njit(cache=True)
+def _cover_col(links, col, row, size, bucket_next, bucket_prev, col_node):
+    ''' cover whole column in matrix '''
+    value_node = col_node
+    for _ in range(size[col_node] + 1):
+        links[links[value_node, LEFT], RIGHT] = links[value_node, RIGHT]
+        links[links[value_node, RIGHT], LEFT] = links[value_node, LEFT]
+        value_node = links[value_node, DOWN]
+    _bucket_remove(bucket_next, bucket_prev, col_node)
+
+
+@njit(cache=True)
+def _uncover_col(links, col, row, size, bucket_next, bucket_prev, col_node):
+    ''' uncover whole column in matrix '''
+    _bucket_insert(size, bucket_next, bucket_prev, col_node)
+    value_node = col_node
+    for _ in range(size[col_node] + 1):
+        value_node = links[value_node, UP]
+        links[links[value_node, LEFT], RIGHT] = value_node
+        links[links[value_node, RIGHT], LEFT] = value_node
+
+
+@njit(cache=True)
+def _cover_row(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' cover whole row in matrix '''
+    value_node = row_node
+    while True:
+        links[links[value_node, UP], DOWN] = links[value_node, DOWN]
+        links[links[value_node, DOWN], UP] = links[value_node, UP]
+        value_node = links[value_node, RIGHT]
+        if value_node == row_node:
+            break
+        _resize(size, bucket_next, bucket_prev, col[value_node], -1)
+
+
+@njit(cache=True)
+def _uncover_row(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' uncover whole row in matrix '''
+    value_node = row_node
+    while True:
+        value_node = links[value_node, LEFT]
+        links[links[value_node, UP], DOWN] = value_node
+        links[links[value_node, DOWN], UP] = value_node
+        if value_node == row_node:
+            break
+        _resize(size, bucket_next, bucket_prev, col[value_node], 1)
+
+
+@njit(cache=True)
+def _cover_col_rows(links, col, row, size, bucket_next, bucket_prev, col_node):
+    ''' cover column and all rows that are in it '''
+    _cover_col(links, col, row, size, bucket_next, bucket_prev, col_node)
+    value_node = links[col_node, DOWN]
+    for _ in range(size[col_node]):
+        _cover_row(links, col, row, size, bucket_next, bucket_prev, row[value_node])
+        value_node = links[value_node, DOWN]
+
+
+@njit(cache=True)
+def _uncover_col_rows(links, col, row, size, bucket_next, bucket_prev, col_node):
+    ''' uncover column and all rows that are in it '''
+    value_node = links[col_node, UP]
+    for _ in range(size[col_node]):
+        _uncover_row(links, col, row, size, bucket_next, bucket_prev, row[value_node])
+        value_node = links[value_node, UP]
+    _uncover_col(links, col, row, size, bucket_next, bucket_prev, col_node)
+
+
+@njit(cache=True)
+def _cover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' cover all columns that are in a covered row, plus all rows that are in each of these columns '''
+    value_node = links[row_node, RIGHT]
+    while value_node != row_node:
+        _cover_col_rows(links, col, row, size, bucket_next, bucket_prev, col[value_node])
+        value_node = links[value_node, RIGHT]
+
+
+@njit(cache=True)
+def _uncover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' uncover all columns that are in a covered row, plus all rows that are in each of these columns '''
+    value_node = links[row_node, LEFT]
+    while value_node != row_node:
+        _uncover_col_rows(links, col, row, size, bucket_next, bucket_prev, col[value_node])
+        value_node = links[value_node, LEFT]
+
+
+@njit(cache=True)
+def _cover_picked_row(links, col, row, size, bucket_next, bucket_prev, other_cols, value_node):
+    ''' cover the rest of the row of a value node picked by _solve: the value node itself went with the column it
+        was picked from, so this covers the other columns in its row, plus all rows that are in each of them.  If
+        other_cols is not empty, it lists these columns for every value node (the last len(other_cols) nodes), so
+        they are covered straight from there instead of following the links of the row '''
+    if len(other_cols) == 0:
+        _cover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row[value_node])
+        return
+    cols = other_cols[value_node - (len(links) - len(other_cols))]
+    for k in range(len(cols)):
+        _cover_col_rows(links, col, row, size, bucket_next, bucket_prev, cols[k])
+
+
+@njit(cache=True)
+def _uncover_picked_row(links, col, row, size, bucket_next, bucket_prev, other_cols, value_node):
+    ''' undo _cover_picked_row '''
+    if len(other_cols) == 0:
+        _uncover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row[value_node])
+        return
+    cols = other_cols[value_node - (len(links) - len(other_cols))]
+    for k in range(len(cols) - 1, -1, -1):
+        _uncover_col_rows(links, col, row, size, bucket_next, bucket_prev, cols[k])
+
+
+@njit(cache=True)
+def _cover_row_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' cover row and all columns that are in it, plus all rows that are in each of these columns '''
+    _cover_row(links, col, row, size, bucket_next, bucket_prev, row_node)
+    _cover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node)
+
+
+@njit(cache=True)
+def _uncover_row_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node):
+    ''' uncover row and all columns that are in it, plus all rows that are in each of these columns '''
+    _uncover_cols_rows(links, col, row, size, bucket_next, bucket_prev, row_node)
+    _uncover_row(links, col, row, size, bucket_next, bucket_prev, row_node)
+
+
+@njit(cache=True)
+def _solve(links, col, row, size, bucket_next, bucket_prev, stack, other_cols):
+    ''' Depth-first search written as a loop: stack[depth] is the value node whose row was picked at that depth.
+        Returns the depth of the solution found (so the solution is stack[:depth]), or -1 if there is none.  Either
+        way, everything that was covered during the search has been uncovered again.  See _cover_picked_row for
+        other_cols. '''
+    root = 0
+    depth = 0
+    while True:
+        # if no more data, solution has been found, so uncover everything on the way out:
+        if links[root, RIGHT] == root:
+            for i in range(depth - 1, -1, -1):
+                _uncover_picked_row(links, col, row, size, bucket_next, bucket_prev, other_cols, stack[i])
+                _uncover_col_rows(links, col, row, size, bucket_next, bucket_prev, col[stack[i]])
+            return depth
+
+        # pick column that minimizes branching factor, i.e. the first one in the smallest non-empty bucket:
+        head = len(size)
+        while bucket_next[head] == head:
+            head += 1
+        c_min = bucket_next[head]
+
+        # dancing links (covering c_min also covers every row in it, so picking a row only has to cover the rest):
+        _cover_col_rows(links, col, row, size, bucket_next, bucket_prev, c_min)
+        value_node = links[c_min, DOWN]
+
+        # if there are no more options in this column, backtrack to the next option of an earlier column:
+        while value_node == c_min:
+            _uncover_col_rows(links, col, row, size, bucket_next, bucket_prev, c_min)
+            if depth == 0:
+                return -1
+            depth -= 1
+            value_node = stack[depth]
+            c_min = col[value_node]
+            _uncover_picked_row(links, col, row, size, bucket_next, bucket_prev, other_cols, value_node)
+            value_node = links[value_node, DOWN]
+
+        _cover_picked_row(links, col, row, size, bucket_next, bucket_prev, other_cols, value_node)
+        stack[depth] = value_node
+        depth += 1
 
-class Node:
-    ''' Node in a 2D linked list.  There will be four different kinds of nodes:
-        root node: serves no other purpose than a place-holder in the top-left corner
-        column node: first row of nodes, contains a size field that tells you how many value nodes are in it
-        row node: first column of nodes on left, contains name field which we need to identify solution
-        value node: this corresponds to a 1 in the index matrix for the row and column it is associated with '''
-    def __init__(self, name=None):
-        self.up = self.down = self.right = self.left = self.column = self.row = self
-        if name:
-            self.name = name
 
 class DLX:
-    ''' Dancing Links '''
-    def __init__(self, idx_matrix, idx_names):
+    ''' Dancing Links.  The 2D linked list is stored as parallel int32 arrays indexed by node id, so that following
+        a link is just an array lookup.  There are four different kinds of nodes:
+        root node (id 0): serves no other purpose than a place-holder in the top-left corner
+        column nodes (ids 1 through cols): first row of nodes, size[id] tells you how many value nodes are in it
+        row nodes (ids row_node(0) through row_node(rows - 1)): first column of nodes on left, idx_names (a numpy
+        array) gives the name of each row, which is what we need to identify the solution
+        value nodes (remaining ids): these correspond to a 1 in the index matrix for the row and column they are in
+        links[id] holds the left, right, up and down neighbours of every node (L, R, U and D are views of each of
+        these), col and row the column and row node it belongs to.  To find the smallest column quickly, the columns
+        are also kept in one doubly linked list per size through bucket_next and bucket_prev, where node len(size) + s
+        heads the list of columns of size s.  If every row has the same number of ones, row_cols may give their
+        column indices (one row of row_cols per row of idx_matrix); solve then covers the other columns of a picked
+        row straight from that table.  The methods below are thin wrappers around the compiled functions above. '''
+    def __init__(self, idx_matrix, idx_names, row_cols=None):
         self.rows, self.cols = idx_matrix.shape
-        self.root = Node()
+        self.root = 0
+        n_nodes = 1 + self.cols + self.rows + np.count_nonzero(idx_matrix)
+
+        # every node starts out linked to itself:
+        self.links = np.repeat(np.arange(n_nodes, dtype=np.int32)[:, None], 4, axis=1)
+        self.L, self.R, self.U, self.D = (self.links[:, direction] for direction in (LEFT, RIGHT, UP, DOWN))
+        self.col = np.arange(n_nodes, dtype=np.int32)
+        self.row = self.col.copy()
+        self.size = np.zeros(1 + self.cols, dtype=np.int32)
+        self.name = np.asarray(idx_names)
+        L, R, U, D, col, row, size, root = self.L, self.R, self.U, self.D, self.col, self.row, self.size, self.root
+
+        # every level of the search covers at least one column, so this is as deep as it can go:
+        self._stack = np.empty(self.cols, dtype=np.int32)
 
         # add column nodes:
         for j in range(self.cols):
-            col_node = Node()
-            col_node.left = self.root.left
-            col_node.right = self.root
-            col_node.size = 0
-            self.root.left.right = col_node
-            self.root.left = col_node
+            col_node = 1 + j
+            L[col_node] = L[root]
+            R[col_node] = root
+            R[L[root]] = col_node
+            L[root] = col_node
 
         # populate matrix rows:
+        value_node = self.row_node(self.rows)
         for i in range(self.rows):
-            col_node = self.root
-            row_node = Node(idx_names[i])
-            row_node.down = self.root
-            row_node.up = self.root.up
-            row_node.column = col_node
-            self.root.up.down = row_node
-            self.root.up = row_node
-            for j in range(self.cols):
-                col_node = col_node.right
-                if idx_matrix[i, j]:
-                    value_node = Node()
-                    value_node.left = row_node.left
-                    value_node.right = row_node
-                    value_node.up = col_node.up
-                    value_node.down = value_node.column = col_node
-                    value_node.row = row_node
-                    row_node.left.right = value_node
-                    row_node.left = value_node
-                    col_node.size += 1
-                    col_node.up.down = value_node
-                    col_node.up = value_node
+            row_node = self.row_node(i)
+            D[row_node] = root
+            U[row_node] = U[root]
+            col[row_node] = root
+            D[U[root]] = row_node
+            U[root] = row_node
+            for j in np.flatnonzero(idx_matrix[i]):
+                col_node = 1 + j
+                L[value_node] = L[row_node]
+                R[value_node] = row_node
+                U[value_node] = U[col_node]
+                D[value_node] = col[value_node] = col_node
+                row[value_node] = row_node
+                R[L[row_node]] = value_node
+                L[row_node] = value_node
+                size[col_node] += 1
+                D[U[col_node]] = value_node
+                U[col_node] = value_node
+                value_node += 1
+
+        # sort columns into buckets by size (inserting backwards keeps them in order within each bucket):
+        n_buckets = len(size) + size.max() + 1
+        self.bucket_next = np.arange(n_buckets, dtype=np.int32)
+        self.bucket_prev = self.bucket_next.copy()
+        for col_node in range(self.cols, 0, -1):
+            _bucket_insert(size, self.bucket_next, self.bucket_prev, col_node)
+        self._arrays = (self.links, col, row, size, self.bucket_next, self.bucket_prev)
+
+        # from row_cols, keep a table of the other column nodes of each value node:
+        self._other_cols = np.zeros((0, 0), dtype=np.int32)
+        if row_cols is not None:
+            row_cols = 1 + np.asarray(row_cols)
+            value_nodes = np.arange(self.row_node(self.rows), n_nodes)
+            value_row_cols = row_cols[row[value_nodes] - self.row_node(0)]
+            others = value_row_cols != col[value_nodes][:, None]
+            self._other_cols = value_row_cols[others].reshape(len(value_nodes), -1).astype(np.int32)
+        self._initial = [array.copy() for array in self._arrays]
+
+    def row_node(self, i):
+        ''' returns the node id of the row node of row i of the index matrix '''
+        return 1 + self.cols + i
 
     def cover_col(self, col_node):
         ''' cover whole column in matrix '''
-        value_node = col_node
-        while True:
-            value_node.left.right = value_node.right
-            value_node.right.left = value_node.left
-            value_node = value_node.down
-            if value_node == col_node:
-                break
-        self.cols -= 1
+        _cover_col(*self._arrays, col_node)
 
     def uncover_col(self, col_node):
         ''' uncover whole column in matrix '''
-        value_node = col_node
-        while True:
-            value_node = value_node.up
-            value_node.left.right = value_node
-            value_node.right.left = value_node
-            if value_node == col_node:
-                break
-        self.cols += 1
+        _uncover_col(*self._arrays, col_node)
 
     def cover_row(self, row_node):
         ''' cover whole row in matrix '''
-        value_node = row_node
-        while True:
-            value_node.up.down = value_node.down
-            value_node.down.up = value_node.up
-            value_node = value_node.right
-            if value_node == row_node:
-                break
-        self.rows -= 1
+        _cover_row(*self._arrays, row_node)
 
     def uncover_row(self, row_node):
         ''' uncover whole row in matrix '''
-        value_node = row_node
-        while True:
-            value_node = value_node.left
-            value_node.up.down = value_node
-            value_node.down.up = value_node
-            if value_node == row_node:
-                break
-        self.rows += 1
+        _uncover_row(*self._arrays, row_node)
 
     def cover_col_rows(self, col_node):
         ''' cover column and all rows that are in it '''
-        self.cover_col(col_node)
-        value_node = col_node.down
-        while value_node != col_node:
-            self.cover_row(value_node.row)
-            value_node = value_node.down
+        _cover_col_rows(*self._arrays, col_node)
 
     def uncover_col_rows(self, col_node):
         ''' uncover column and all rows that are in it '''
-        value_node = col_node.up
-        while value_node != col_node:
-            self.uncover_row(value_node.row)
-            value_node = value_node.up
-        self.uncover_col(col_node)
+        _uncover_col_rows(*self._arrays, col_node)
 
     def cover_row_cols_rows(self, row_node):
         ''' cover row and all columns that are in it, plus all rows that are in each of these columns '''
-        self.cover_row(row_node)
-        value_node = row_node.right
-        while value_node != row_node:
-            self.cover_col_rows(value_node.column)
-            value_node = value_node.right
+        _cover_row_cols_rows(*self._arrays, row_node)
 
     def uncover_row_cols_rows(self, row_node):
         ''' uncover row and all columns that are in it, plus all rows that are in each of these columns '''
-        value_node = row_node.left
-        while value_node != row_node:
-            self.uncover_col_rows(value_node.column)
-            value_node = value_node.left
-        self.uncover_row(row_node)
+        _uncover_row_cols_rows(*self._arrays, row_node)
+
+    def reset(self):
+        ''' uncover everything at once by restoring all arrays to how they were right after construction '''
+        for array, initial in zip(self._arrays, self._initial):
+            np.copyto(array, initial)
 
     def get_matrix(self):
-        ''' prints the index matrix (useful for debugging) '''
-        idx_matrix = np.zeros((self.rows, self.cols), dtype=int)
-        column_node = self.root
-        row_node = self.root
-        for i in range(self.rows):
-            row_node = row_node.down
-            value_node = row_node.right
-            for j in range(self.cols):
-                column_node = column_node.right
-                if value_node.column == column_node:
-                    idx_matrix[i, j] = 1
-                    value_node = value_node.right
-            column_node = column_node.right
+        ''' returns the index matrix of the rows and columns that are still uncovered (useful for debugging) '''
+        R, D, col = self.R, self.D, self.col
+        row_nodes = []
+        node = D[self.root]
+        while node != self.root:
+            row_nodes.append(node)
+            node = D[node]
+        col_nodes = []
+        node = R[self.root]
+        while node != self.root:
+            col_nodes.append(node)
+            node = R[node]
+
+        # collect (row, column node) of every value node, then set them all at once:
+        col_idx = np.zeros(len(self.size), dtype=int)
+        col_idx[col_nodes] = np.arange(len(col_nodes))
+        value_rows, value_cols = [], []
+        for i, row_node in enumerate(row_nodes):
+            node = R[row_node]
+            while node != row_node:
+                value_rows.append(i)
+                value_cols.append(col[node])
+                node = R[node]
+        idx_matrix = np.zeros((len(row_nodes), len(col_nodes)), dtype=int)
+        idx_matrix[value_rows, col_idx[value_cols]] = 1
         return idx_matrix
 
     def solve(self):
-        ''' returns list of row names if solution exists, otherwise None '''
-        # if no more data, solution has been found:
-        if self.root.right == self.root:
-            return []
-
-        # pick column that minimizes branching factor:
-        column_node = self.root.right
-        c_min = column_node
-        while column_node != self.root:
-            if column_node.size < c_min.size:
-                c_min = column_node
-            column_node = column_node.right
-
-        # if there are no more options, no solution:
-        if c_min.size == 0:
+        ''' returns array of row names if solution exists, otherwise None '''
+        depth = _solve(*self._arrays, self._stack, self._other_cols)
+        if depth < 0:
             return None
+        return self.name[self.row[self._stack[:depth]] - self.row_node(0)]
 
-        # dancing links:
-        self.cover_col_rows(c_min)
-        value_node = c_min.down
-        sol = None
-        while value_node != c_min:
-            self.cover_row_cols_rows(value_node.row)
-            sol = self.solve()
-            self.uncover_row_cols_rows(value_node.row)
-            if sol is not None:
-                break
-            value_node = value_node.down
-        self.uncover_col_rows(c_min)
 
-        # return solutions:
-        if sol is not None:
-            return [value_node.row.name] + sol
-
-        return None
+# compile everything up front (or load it from Numba's cache), rather than on the first click of Solve:
+_dlx = DLX(np.ones((1, 1)), np.zeros(1, dtype=np.int32))
+_dlx.cover_row_cols_rows(_dlx.row_node(0))
+_dlx.uncover_row_cols_rows(_dlx.row_node(0))
+_dlx.solve()
+del _dlx
 
 
 # Sudoku GUI:
@@ -196,6 +381,88 @@ class InconsistentInputs(Exception):
     ''' raised when there is no solution '''
 
 
+# the 9 cells (as flat indices into the grid) of each of the 27 units: rows 0 through 8, columns 9 through 17 and
+# groups 18 through 26
+_UNIT_CELLS = np.array([[i * 9 + j for j in range(9)] for i in range(9)] +
+                       [[i * 9 + j for i in range(9)] for j in range(9)] +
+                       [[(3 * (b // 3) + k // 3) * 9 + 3 * (b % 3) + k % 3 for k in range(9)] for b in range(9)],
+                       dtype=np.int32)
+
+
+@njit(cache=True)
+def _place(grid, row_mask, col_mask, box_mask, cell, val):
+    ''' puts val in cell (a flat index into the grid) and adds it to the masks of its row, column and group '''
+    i, j = cell // 9, cell % 9
+    bit = 1 << (val - 1)
+    grid[i, j] = val
+    row_mask[i] |= bit
+    col_mask[j] |= bit
+    box_mask[3 * (i // 3) + j // 3] |= bit
+
+
+@njit(cache=True)
+def _propagate(grid, row_mask, col_mask, box_mask):
+    ''' Fill in every cell that has only one candidate left (naked single) and every value that has only one cell
+        left in its row, column or group (hidden single), until nothing changes.  Candidates are 9-bit masks, bit
+        val - 1 meaning that val is still allowed; the masks of the values placed in each row, column and group (see
+        TableModel._masks) are updated along with the grid.  Returns False if this runs into a contradiction. '''
+    cand = np.zeros(81, dtype=np.uint16)
+    changed = True
+    while changed:
+        changed = False
+
+        # naked singles, working out the candidates of every empty cell once per sweep:
+        for cell in range(81):
+            i, j = cell // 9, cell % 9
+            cand[cell] = 0
+            if grid[i, j] == 0:
+                cand[cell] = 0x1FF ^ (row_mask[i] | col_mask[j] | box_mask[3 * (i // 3) + j // 3])
+                if cand[cell] == 0:
+                    return False
+                if cand[cell] & (cand[cell] - 1) == 0:
+                    for val in range(1, 10):
+                        if cand[cell] == 1 << (val - 1):
+                            _place(grid, row_mask, col_mask, box_mask, cell, val)
+                    cand[cell] = 0
+                    changed = True
+
+        # hidden singles (candidates worked out before a placement in this sweep may still include its value, so
+        # they can only overcount; a single cell found that way is checked against the masks before placing):
+        for unit in range(27):
+            kind, k = unit // 9, unit % 9
+            if kind == 0:
+                placed = row_mask[k]
+            elif kind == 1:
+                placed = col_mask[k]
+            else:
+                placed = box_mask[k]
+            for val in range(1, 10):
+                bit = 1 << (val - 1)
+                if placed & bit:
+                    continue
+                count = 0
+                last = 0
+                for cell in _UNIT_CELLS[unit]:
+                    if cand[cell] & bit and grid[cell // 9, cell % 9] == 0:
+                        count += 1
+                        last = cell
+                if count == 0:
+                    return False
+                if count == 1:
+                    i, j = last // 9, last % 9
+                    if (row_mask[i] | col_mask[j] | box_mask[3 * (i // 3) + j // 3]) & bit:
+                        return False
+                    _place(grid, row_mask, col_mask, box_mask, last, val)
+                    cand[last] = 0
+                    placed |= bit
+                    changed = True
+    return True
+
+
+# as for DLX, compile this up front rather than on the first click of Solve:
+_propagate(np.zeros((9, 9), dtype=np.uint8), *(np.zeros(9, dtype=np.uint16) for _ in range(3)))
+
+
 class TableModel(QAbstractTableModel):
     ''' Custom model for storing display data.  We use two Numpy arrays, one for user data (displayed in black) that
         the user enters, and another for solver data (displayed in blue) that we will compute and enter. '''
@@ -204,9 +471,18 @@ class TableModel(QAbstractTableModel):
         self._user_data = user_data             # data that user types in
         self._solver_data = solver_data         # data that gets solved
 
+        # display settings are the same for every cell, so create them once rather than on every call of data:
+        self._font = QFont('Times', FONT_SIZE)
+        self._background = QColor('lightgrey')
+        self._solved_color = QColor('blue')
+
+        self._dlx = None                        # linked list for the solver, built when first needed
+
+    def _build_dlx(self):
+        ''' builds the linked list for the solver; this only happens the first time a puzzle needs it '''
         # sudoku encoding into index matrix:
-        # all rows are named (val, (row, col)) which means that the number val appears at (row, col) in the grid
-        # so there are 9^3 = 729 rows
+        # all rows are named (val - 1) * 81 + row * 9 + col which means that the number val appears at (row, col) in
+        # the grid, so there are 9^3 = 729 rows and each is named by its index
         # the columns are the constraints:
         # 0 through 80: only one value per location in the grid, so this is just the location in the grid,
         # traversing left-to-right, then top-to-bottom
@@ -214,20 +490,14 @@ class TableModel(QAbstractTableModel):
         # 162 through 242: only one value per row, so this is just value 1 through 9 x rows 1 through 9
         # 243 through 323: only one value per group, so this is just value 1 through 9 x groups 1 through 9
         # total constraint columns = 81 * 4 = 324
-        sudoku_matrix = np.zeros((9 ** 3, 9 ** 2 * 4))
-        sudoku_names = []
-        for i in range(9):
-            for j in range(81):
-                row = j // 9
-                col = j % 9
-                sudoku_names.append((i + 1, (row, col)))
-                group = 3 * (row // 3) + (col // 3)
-                row_idx = i * 81 + j
-                sudoku_matrix[row_idx, j] = 1
-                sudoku_matrix[row_idx, 81 + i * 9 + row] = 1
-                sudoku_matrix[row_idx, 2 * 81 + i * 9 + col] = 1
-                sudoku_matrix[row_idx, 3 * 81 + i * 9 + group] = 1
-        self._dlx = DLX(sudoku_matrix, sudoku_names)
+        row_idx = np.arange(9 ** 3, dtype=np.int32)
+        val, loc = np.divmod(row_idx, 81)
+        row, col = np.divmod(loc, 9)
+        group = 3 * (row // 3) + (col // 3)
+        row_cols = np.stack([loc, 81 + val * 9 + row, 2 * 81 + val * 9 + col, 3 * 81 + val * 9 + group], axis=1)
+        sudoku_matrix = np.zeros((9 ** 3, 9 ** 2 * 4), dtype=np.uint8)
+        sudoku_matrix[row_idx[:, None], row_cols] = 1
+        self._dlx = DLX(sudoku_matrix, row_idx, row_cols=row_cols)
 
     def setData(self, index, value):
         ''' sets data point that the user enters '''
@@ -235,45 +505,65 @@ class TableModel(QAbstractTableModel):
         col = index.column()
 
         # if we set something different, remove all solved data, since it's now wrong
+        top_left = bottom_right = index
         if self._solver_data[row, col] != 0 and self._solver_data[row, col] != value:
             self._solver_data[:] = 0
+            top_left, bottom_right = self.index(0, 0), self.index(8, 8)
 
         self._user_data[row, col] = value
+        self.dataChanged.emit(top_left, bottom_right, [Qt.DisplayRole, Qt.ForegroundRole])
 
     def clearData(self):
         ''' user clears all data '''
         self._user_data[:] = 0
         self._solver_data[:] = 0
 
+    @staticmethod
+    def _masks(grid):
+        ''' Returns the values already placed in each row, column and group of the grid as 9-bit masks, bit val - 1
+            meaning that val is there.  Raises InconsistentInputs if any of them has the same value twice. '''
+        row_mask = np.zeros(9, dtype=np.uint16)
+        col_mask = np.zeros(9, dtype=np.uint16)
+        box_mask = np.zeros(9, dtype=np.uint16)
+        for i in range(9):
+            for j in range(9):
+                val = grid[i, j]
+                if val:
+                    bit = 1 << (int(val) - 1)
+                    b = 3 * (i // 3) + j // 3
+                    if (row_mask[i] | col_mask[j] | box_mask[b]) & bit:
+                        raise InconsistentInputs('Inconsistent!')
+                    row_mask[i] |= bit
+                    col_mask[j] |= bit
+                    box_mask[b] |= bit
+        return row_mask, col_mask, box_mask
+
     def solve(self):
-        ''' Solve the Sudoku by first covering all rows corresponding to what the user has selected, and then finding
-            if rest of solution exists.  If not, raise a warning.  Either way, we uncover everything when we're done
-            so that we can reuse the same linked list. '''
+        ''' Solve the Sudoku by first checking that no value is repeated and filling in everything that follows directly
+            from the rules, which is often the whole puzzle.  Whatever is left goes to DLX by covering all rows
+            corresponding to the cells that are known, and then finding if rest of solution exists.  If not, raise a
+            warning.  Either way, we reset the linked list when we're done so that we can reuse it. '''
         self._solver_data = self._user_data.copy()
-        covers = []
+        grid = self._user_data.copy()
 
         try:
+            if not _propagate(grid, *self._masks(grid)):
+                raise InconsistentInputs('Inconsistent!')
+            if grid.all():
+                self._solver_data = grid
+                return
+            if self._dlx is None:
+                self._build_dlx()
             for i in range(9):
                 for j in range(9):
-                    val = self._user_data[i, j]
+                    val = grid[i, j]
                     if val:
-                        node_name = (val, (i, j))
-                        node = self._dlx.root.down
-                        found = False
-                        while node != self._dlx.root:
-                            if node.name == node_name:
-                                found = True
-                                self._dlx.cover_row_cols_rows(node)
-                                covers.append(node)
-                                break
-                            node = node.down
-                        if not found:
-                            raise InconsistentInputs('Inconsistent!')
+                        self._dlx.cover_row_cols_rows(self._dlx.row_node((int(val) - 1) * 81 + i * 9 + j))
             sol = self._dlx.solve()
             if sol is None:
                 raise InconsistentInputs('Inconsistent!')
-            for val, (i, j) in sol:
-                self._solver_data[i, j] = val
+            grid.flat[sol % 81] = sol // 81 + 1
+            self._solver_data = grid
         except InconsistentInputs as e:
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Information)
@@ -282,9 +572,8 @@ class TableModel(QAbstractTableModel):
             msg.setWindowTitle("No Solution:")
             msg.exec_()
         finally:
-            while covers:
-                node = covers.pop()
-                self._dlx.uncover_row_cols_rows(node)
+            if self._dlx is not None:
+                self._dlx.reset()
 
 
     def data(self, index, role):
@@ -294,15 +583,15 @@ class TableModel(QAbstractTableModel):
                        self._solver_data[index.row(), index.column()] or '')
         if role == Qt.BackgroundRole:
             if (index.row() // 3 + index.column() // 3) % 2 == 1:
-                return QColor('lightgrey')
+                return self._background
         elif role == Qt.ForegroundRole:
             if self._user_data[index.row(), index.column()] == 0 \
                 and self._solver_data[index.row(), index.column()] > 0:
-                return QColor('blue')
+                return self._solved_color
         elif role == Qt.TextAlignmentRole:
             return Qt.AlignVCenter + Qt.AlignHCenter
         elif role == Qt.FontRole:
-            return QFont('Times', FONT_SIZE)
+            return self._font
         return QVariant()
 
     def rowCount(self, *_):
@@ -334,7 +623,6 @@ class MyTableView(QTableView):
             idx = self.selectionModel().currentIndex()
             val = key - Qt.Key_0 if key != Qt.Key_Delete else 0
             self.model().setData(idx, val)
-            self.viewport().update()
         else:
             super().keyPressEvent(event)
 
@@ -346,8 +634,8 @@ class MainWindow(QMainWindow):
 
         self.table = MyTableView()
 
-        user_data = np.zeros((9, 9), dtype=int)
-        solver_data = np.zeros((9, 9), dtype=int)
+        user_data = np.zeros((9, 9), dtype=np.uint8)
+        solver_data = np.zeros((9, 9), dtype=np.uint8)
         self.model = TableModel(user_data, solver_data)
         self.table.setModel(self.model)
 